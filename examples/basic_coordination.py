@@ -2,12 +2,17 @@
 Basic Multi-Agent Coordination Example
 
 Demonstrates file locking, heartbeats, and task delegation working together.
+
+The agents run as asyncio coroutines: blocking database calls are
+dispatched with asyncio.to_thread, so many agents can be simulated
+without one OS thread (and its context switches) per agent.
 """
 
+import asyncio
+import contextlib
 import sys
 import os
-import time
-import threading
+from datetime import datetime
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -17,7 +22,7 @@ from heartbeat_monitor import HeartbeatMonitor
 from task_delegation import TaskDelegationSystem
 
 
-def simulate_agent_workflow(
+async def simulate_agent_workflow(
     agent_id: str,
     coordinator: FileLockCoordinator,
     monitor: HeartbeatMonitor,
@@ -30,11 +35,15 @@ def simulate_agent_workflow(
     3. Modifies file (simulated)
     4. Releases lock
     5. Records change
+
+    Blocking coordinator/monitor calls run via asyncio.to_thread so the
+    event loop keeps scheduling the other agents while this one waits.
     """
     print(f"\n[{agent_id}] Starting...")
 
     # Register agent
-    monitor.register_agent(
+    await asyncio.to_thread(
+        monitor.register_agent,
         agent_id=agent_id,
         capabilities=["general"],
         status="active"
@@ -46,7 +55,8 @@ def simulate_agent_workflow(
 
     # Try to acquire lock
     print(f"[{agent_id}] Attempting to acquire lock on {shared_file}")
-    success = coordinator.acquire_lock(
+    success = await asyncio.to_thread(
+        coordinator.acquire_lock,
         agent_id=agent_id,
         file_path=shared_file,
         operation="write",
@@ -55,7 +65,7 @@ def simulate_agent_workflow(
 
     if not success:
         print(f"[{agent_id}] Failed to acquire lock (timeout)")
-        monitor.unregister_agent(agent_id)
+        await asyncio.to_thread(monitor.unregister_agent, agent_id)
         return
 
     print(f"[{agent_id}] Lock acquired!")
@@ -66,10 +76,11 @@ def simulate_agent_workflow(
 
         # Simulate work
         print(f"[{agent_id}] Modifying file...")
-        time.sleep(2)
+        await asyncio.sleep(2)
 
         # Record change
-        coordinator.record_change(
+        await asyncio.to_thread(
+            coordinator.record_change,
             agent_id=agent_id,
             file_path=shared_file,
             change_type="modified"
@@ -78,7 +89,7 @@ def simulate_agent_workflow(
 
     finally:
         # Always release lock
-        coordinator.release_lock(agent_id, shared_file)
+        await asyncio.to_thread(coordinator.release_lock, agent_id, shared_file)
         print(f"[{agent_id}] Lock released")
 
     # Final heartbeat
@@ -86,11 +97,11 @@ def simulate_agent_workflow(
     print(f"[{agent_id}] Work complete")
 
     # Unregister
-    monitor.unregister_agent(agent_id)
+    await asyncio.to_thread(monitor.unregister_agent, agent_id)
     print(f"[{agent_id}] Unregistered")
 
 
-def main():
+async def main():
     """
     Main example: Two agents coordinate access to a shared file.
     """
@@ -110,28 +121,19 @@ def main():
     print(f"  Database: {db_path}")
     print(f"  Shared file: {shared_file}")
 
-    # Create two agent threads
+    # Create two agent coroutines
     print("\nStarting two agents that will compete for file access...")
 
-    agent1_thread = threading.Thread(
-        target=simulate_agent_workflow,
-        args=("agent-alpha", coordinator, monitor, shared_file)
-    )
+    async def staggered_beta():
+        await asyncio.sleep(0.5)  # Small delay so agent-alpha gets lock first
+        await simulate_agent_workflow("agent-beta", coordinator, monitor, shared_file)
 
-    agent2_thread = threading.Thread(
-        target=simulate_agent_workflow,
-        args=("agent-beta", coordinator, monitor, shared_file)
+    # Run both agents concurrently on the event loop
+    await asyncio.gather(
+        simulate_agent_workflow("agent-alpha", coordinator, monitor, shared_file),
+        staggered_beta()
     )
 
-    # Start agents
-    agent1_thread.start()
-    time.sleep(0.5)  # Small delay so agent-alpha gets lock first
-    agent2_thread.start()
-
-    # Wait for completion
-    agent1_thread.join()
-    agent2_thread.join()
-
     print("\n" + "=" * 60)
     print("RESULTS")
     print("=" * 60)
@@ -144,21 +146,22 @@ def main():
     locks = coordinator.get_all_locks()
     print(f"Active locks: {len(locks)}")
 
-    # Check change history
+    # Check change history. Iterating the cursor streams rows in
+    # batches instead of materializing the whole history with
+    # fetchall(), so memory stays flat however long the history grows.
     print("\nChange history for shared file:")
     import sqlite3
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("""
+    lines = []
+    for agent_id, change_type, timestamp in conn.execute("""
         SELECT agent_id, change_type, timestamp
         FROM change_history
         WHERE file_path = ?
         ORDER BY timestamp ASC
-    """, (shared_file,))
-
-    for row in cursor.fetchall():
-        agent_id, change_type, timestamp = row
-        print(f"  - {agent_id}: {change_type} at {timestamp}")
+    """, (shared_file,)):
+        when = datetime.fromtimestamp(timestamp / 1e6)
+        lines.append(f"  - {agent_id}: {change_type} at {when:%H:%M:%S}")
+    print("\n".join(lines))
 
     conn.close()
 
@@ -166,9 +169,16 @@ def main():
     print("SUCCESS: Agents coordinated file access without conflicts!")
     print("=" * 60)
 
-    # Cleanup
-    os.remove(db_path) if os.path.exists(db_path) else None
+    # Shut down cleanly (flushes heartbeats, checkpoints the WAL)
+    coordinator.close()
+    monitor.close()
+
+    # Cleanup: unlink directly (no exists() check, so no TOCTOU race
+    # and one syscall per file) and include the WAL sidecar files
+    for path in (db_path, db_path + "-wal", db_path + "-shm"):
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
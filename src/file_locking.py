@@ -19,6 +19,11 @@ from datetime import datetime
 import threading
 
 
+def _now_us() -> int:
+    """Current time as integer microseconds since the epoch."""
+    return time.time_ns() // 1000
+
+
 class FileLockCoordinator:
     """
     Coordinates file access across multiple agents using pessimistic locking.
@@ -28,46 +33,155 @@ class FileLockCoordinator:
     - Automatic stale lock cleanup (5 minute expiration)
     - Change history tracking
     - Conflict detection
+
+    Two backends are available: "sqlite" (default) survives across
+    processes, while "memory" keeps all state in process-local
+    dictionaries guarded by a condition variable, turning lock
+    operations from millisecond-scale commits into microsecond-scale
+    dict updates for single-process runs and tests.
     """
 
-    def __init__(self, db_path: str = "coordination.db"):
+    LOCK_EXPIRATION_US = 300_000_000  # 5 minutes in microseconds
+
+    def __init__(self, db_path: str = "coordination.db",
+                 backend: Optional[str] = None):
         """
-        Initialize coordinator with SQLite database.
+        Initialize coordinator.
 
         Args:
             db_path: Path to SQLite database file
+            backend: "sqlite" or "memory"; defaults to "memory" when
+                db_path is ":memory:", otherwise "sqlite"
         """
+        if backend is None:
+            backend = "memory" if db_path == ":memory:" else "sqlite"
+        if backend not in ("sqlite", "memory"):
+            raise ValueError(f"unknown backend: {backend!r}")
+
         self.db_path = db_path
-        self.lock = threading.Lock()
+        self.backend = backend
+        self._tls = threading.local()
+        # Same-process waiters park on this instead of polling; cross-
+        # process waiters are bounded by the wait timeout below.
+        self._cv = threading.Condition()
+
+        if backend == "memory":
+            # file_path -> lock record; guarded by self._cv
+            self._mem_locks: Dict[str, Dict] = {}
+            self._mem_history: List[Dict] = []
+            return
+
         self._init_database()
 
+        # Expired locks are stolen atomically on acquire; this low-
+        # frequency sweep just keeps the table from accumulating rows
+        self._sweep_interval = 30.0
+        self._stop_sweep = threading.Event()
+        self._janitor = threading.Thread(
+            target=self._sweep_expired_locks, daemon=True
+        )
+        self._janitor.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a database connection with performance pragmas applied.
+
+        WAL mode lets readers and writers proceed concurrently, and the
+        busy timeout makes SQLite back off internally under contention
+        instead of raising "database is locked" to Python.
+        """
+        conn = sqlite3.connect(
+            self.db_path, isolation_level=None, check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        """
+        Return this thread's cached connection, opening it on first use.
+
+        Connect-per-call pays a file open, header parse, and WAL attach
+        on every operation; caching one connection per thread amortizes
+        that cost and keeps SQLite's statement cache warm.
+        """
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._tls.conn = conn
+        return conn
+
+    def _sweep_expired_locks(self):
+        """Periodically delete expired lock rows (background janitor)."""
+        while not self._stop_sweep.wait(self._sweep_interval):
+            conn = self._conn()
+            conn.execute("""
+                DELETE FROM file_locks
+                WHERE expires_at < ?
+            """, (_now_us(),))
+            # Passive checkpoint keeps the WAL from growing without
+            # blocking concurrent readers or writers
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        """
+        Shut down the coordinator.
+
+        Stops the background janitor, checkpoints and truncates the WAL
+        so the sidecar file does not outlive the process, and closes the
+        calling thread's cached connection.
+        """
+        if self.backend == "memory":
+            return
+
+        self._stop_sweep.set()
+        conn = self._conn()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+        self._tls.conn = None
+
     def _init_database(self):
         """Create necessary database tables."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._connect()
 
         # File locks table
-        cursor.execute("""
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS file_locks (
                 file_path TEXT PRIMARY KEY,
                 agent_id TEXT NOT NULL,
                 operation TEXT NOT NULL,
-                lock_time REAL NOT NULL,
-                expires_at REAL NOT NULL
+                lock_time INTEGER NOT NULL,
+                expires_at INTEGER NOT NULL
             )
         """)
 
         # Change history table
-        cursor.execute("""
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS change_history (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 agent_id TEXT NOT NULL,
                 file_path TEXT NOT NULL,
                 change_type TEXT NOT NULL,
-                timestamp REAL NOT NULL
+                timestamp INTEGER NOT NULL
             )
         """)
 
+        # Indexes for the hot predicates: expired-lock cleanup scans
+        # expires_at, and conflict checks filter by (file_path, timestamp)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_locks_expires
+            ON file_locks(expires_at)
+        """)
+
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_history_path_ts
+            ON change_history(file_path, timestamp DESC)
+        """)
+
         conn.commit()
         conn.close()
 
@@ -82,10 +196,10 @@ class FileLockCoordinator:
         Acquire exclusive lock on file.
 
         Algorithm:
-        1. Check if lock exists
-        2. If exists and not expired, wait or return False
-        3. If expired, clean up stale lock
-        4. Acquire new lock
+        1. Attempt an atomic upsert that takes the lock if the row is
+           absent or the existing lock has expired
+        2. On conflict with a live lock, wait briefly and retry
+        3. Give up once the timeout elapses
 
         Args:
             agent_id: Unique agent identifier
@@ -96,47 +210,46 @@ class FileLockCoordinator:
         Returns:
             True if lock acquired, False if timeout
         """
-        start_time = time.time()
-        lock_expiration = 300  # 5 minutes in seconds
-
-        while time.time() - start_time < timeout_seconds:
-            with self.lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-
-                # Clean up expired locks
-                cursor.execute("""
-                    DELETE FROM file_locks
-                    WHERE expires_at < ?
-                """, (time.time(),))
-
-                # Check if lock exists
-                cursor.execute("""
-                    SELECT agent_id, lock_time, expires_at
-                    FROM file_locks
-                    WHERE file_path = ?
-                """, (file_path,))
-
-                existing_lock = cursor.fetchone()
-
-                if existing_lock is None:
-                    # No lock exists, acquire it
-                    now = time.time()
-                    expires_at = now + lock_expiration
-
-                    cursor.execute("""
-                        INSERT INTO file_locks (file_path, agent_id, operation, lock_time, expires_at)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (file_path, agent_id, operation, now, expires_at))
-
-                    conn.commit()
-                    conn.close()
-                    return True
-
-                conn.close()
+        if self.backend == "memory":
+            return self._mem_acquire_lock(
+                agent_id, file_path, operation, timeout_seconds
+            )
 
-            # Lock exists, wait briefly and retry
-            time.sleep(0.1)
+        conn = self._conn()
+
+        # Sample the clock once per attempt and derive everything from
+        # it (expiry, deadline check, remaining wait)
+        now = _now_us()
+        deadline_us = now + timeout_seconds * 1_000_000
+
+        while now < deadline_us:
+            # Single atomic upsert: take the lock if no row exists, or
+            # steal it if the holder's lock has expired. SQLite makes the
+            # whole statement atomic, so there is no read-then-write race
+            # and no Python-level lock is needed.
+            cursor = conn.execute("""
+                INSERT INTO file_locks (file_path, agent_id, operation, lock_time, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(file_path) DO UPDATE SET
+                    agent_id = excluded.agent_id,
+                    operation = excluded.operation,
+                    lock_time = excluded.lock_time,
+                    expires_at = excluded.expires_at
+                WHERE file_locks.expires_at < excluded.lock_time
+            """, (file_path, agent_id, operation, now,
+                  now + self.LOCK_EXPIRATION_US))
+
+            if cursor.rowcount > 0:
+                return True
+
+            # Lock held by a live agent: block until release_lock
+            # notifies (same process) or a short timeout elapses, rather
+            # than spinning on a fixed sleep
+            remaining = (deadline_us - now) / 1e6
+            with self._cv:
+                self._cv.wait(timeout=min(remaining, 1.0))
+
+            now = _now_us()
 
         # Timeout occurred
         return False
@@ -152,20 +265,23 @@ class FileLockCoordinator:
         Returns:
             True if lock released, False if not held by this agent
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        if self.backend == "memory":
+            return self._mem_release_lock(agent_id, file_path)
 
-            cursor.execute("""
-                DELETE FROM file_locks
-                WHERE file_path = ? AND agent_id = ?
-            """, (file_path, agent_id))
+        conn = self._conn()
 
-            rows_deleted = cursor.rowcount
-            conn.commit()
-            conn.close()
+        released = conn.execute("""
+            DELETE FROM file_locks
+            WHERE file_path = ? AND agent_id = ?
+            RETURNING 1
+        """, (file_path, agent_id)).fetchone() is not None
+
+        if released:
+            # Wake any same-process waiters immediately
+            with self._cv:
+                self._cv.notify_all()
 
-            return rows_deleted > 0
+        return released
 
     def record_change(
         self,
@@ -184,19 +300,20 @@ class FileLockCoordinator:
         Returns:
             Change record ID
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if self.backend == "memory":
+            return self._mem_record_change(agent_id, file_path, change_type)
 
-        cursor.execute("""
+        conn = self._conn()
+
+        # RETURNING hands back the id in the same round trip instead of
+        # a follow-up lastrowid attribute read
+        row = conn.execute("""
             INSERT INTO change_history (agent_id, file_path, change_type, timestamp)
             VALUES (?, ?, ?, ?)
-        """, (agent_id, file_path, change_type, time.time()))
+            RETURNING id
+        """, (agent_id, file_path, change_type, _now_us())).fetchone()
 
-        change_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-
-        return change_id
+        return row[0]
 
     def check_conflicts(
         self,
@@ -213,30 +330,32 @@ class FileLockCoordinator:
         Returns:
             Dictionary with conflict info, or None if no conflicts
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if self.backend == "memory":
+            return self._mem_check_conflicts(file_path, window_seconds)
+
+        conn = self._conn()
 
-        cutoff_time = time.time() - window_seconds
+        now = _now_us()
+        cutoff_time = now - window_seconds * 1_000_000
 
-        cursor.execute("""
+        result = conn.execute("""
             SELECT agent_id, change_type, timestamp
             FROM change_history
             WHERE file_path = ? AND timestamp > ?
             ORDER BY timestamp DESC
             LIMIT 1
-        """, (file_path, cutoff_time))
-
-        result = cursor.fetchone()
-        conn.close()
+        """, (file_path, cutoff_time)).fetchone()
 
         if result:
             agent_id, change_type, timestamp = result
+            # Timestamps are stored as integer microseconds; convert to
+            # epoch seconds only at the output boundary
             return {
                 "has_conflict": True,
                 "last_agent": agent_id,
                 "change_type": change_type,
-                "timestamp": timestamp,
-                "age_seconds": time.time() - timestamp
+                "timestamp": timestamp / 1e6,
+                "age_seconds": (now - timestamp) / 1e6
             }
 
         return None
@@ -248,35 +367,148 @@ class FileLockCoordinator:
         Returns:
             List of lock dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if self.backend == "memory":
+            return self._mem_get_all_locks()
+
+        conn = self._conn()
+        now = _now_us()
 
         # Clean up expired locks first
-        cursor.execute("""
+        conn.execute("""
             DELETE FROM file_locks
             WHERE expires_at < ?
-        """, (time.time(),))
-        conn.commit()
+        """, (now,))
 
-        cursor.execute("""
-            SELECT file_path, agent_id, operation, lock_time, expires_at
+        # Compute the age once in SQL rather than per row in Python
+        cursor = conn.execute("""
+            SELECT file_path, agent_id, operation, lock_time, expires_at,
+                   (? - lock_time) AS age_us
             FROM file_locks
-        """)
+        """, (now,))
 
         locks = []
         for row in cursor.fetchall():
             locks.append({
-                "file_path": row[0],
-                "agent_id": row[1],
-                "operation": row[2],
-                "lock_time": row[3],
-                "expires_at": row[4],
-                "age_seconds": time.time() - row[3]
+                "file_path": row["file_path"],
+                "agent_id": row["agent_id"],
+                "operation": row["operation"],
+                "lock_time": row["lock_time"] / 1e6,
+                "expires_at": row["expires_at"] / 1e6,
+                "age_seconds": row["age_us"] / 1e6
             })
 
-        conn.close()
         return locks
 
+    # ------------------------------------------------------------------
+    # In-memory backend: dict + condition variable, no SQLite round trips
+    # ------------------------------------------------------------------
+
+    def _mem_acquire_lock(
+        self,
+        agent_id: str,
+        file_path: str,
+        operation: str,
+        timeout_seconds: int
+    ) -> bool:
+        """Memory-backend acquire: wait on the condition variable, no polling."""
+        deadline_us = _now_us() + timeout_seconds * 1_000_000
+
+        with self._cv:
+            while True:
+                now = _now_us()
+                existing = self._mem_locks.get(file_path)
+
+                if existing is None or existing["expires_at"] < now:
+                    self._mem_locks[file_path] = {
+                        "file_path": file_path,
+                        "agent_id": agent_id,
+                        "operation": operation,
+                        "lock_time": now,
+                        "expires_at": now + self.LOCK_EXPIRATION_US
+                    }
+                    return True
+
+                remaining = (deadline_us - now) / 1e6
+                if remaining <= 0:
+                    return False
+                self._cv.wait(timeout=remaining)
+
+    def _mem_release_lock(self, agent_id: str, file_path: str) -> bool:
+        """Memory-backend release: drop the record and wake waiters."""
+        with self._cv:
+            existing = self._mem_locks.get(file_path)
+            if existing is None or existing["agent_id"] != agent_id:
+                return False
+
+            del self._mem_locks[file_path]
+            self._cv.notify_all()
+            return True
+
+    def _mem_record_change(
+        self,
+        agent_id: str,
+        file_path: str,
+        change_type: str
+    ) -> int:
+        with self._cv:
+            change_id = len(self._mem_history) + 1
+            self._mem_history.append({
+                "id": change_id,
+                "agent_id": agent_id,
+                "file_path": file_path,
+                "change_type": change_type,
+                "timestamp": _now_us()
+            })
+            return change_id
+
+    def _mem_check_conflicts(
+        self,
+        file_path: str,
+        window_seconds: int
+    ) -> Optional[Dict]:
+        now = _now_us()
+        cutoff_time = now - window_seconds * 1_000_000
+
+        with self._cv:
+            for change in reversed(self._mem_history):
+                if change["file_path"] != file_path:
+                    continue
+                if change["timestamp"] <= cutoff_time:
+                    break
+                return {
+                    "has_conflict": True,
+                    "last_agent": change["agent_id"],
+                    "change_type": change["change_type"],
+                    "timestamp": change["timestamp"] / 1e6,
+                    "age_seconds": (now - change["timestamp"]) / 1e6
+                }
+
+        return None
+
+    def _mem_get_all_locks(self) -> List[Dict]:
+        now = _now_us()
+
+        with self._cv:
+            # Drop expired locks while listing
+            expired = [
+                path for path, rec in self._mem_locks.items()
+                if rec["expires_at"] < now
+            ]
+            for path in expired:
+                del self._mem_locks[path]
+
+            return [
+                {
+                    "file_path": rec["file_path"],
+                    "agent_id": rec["agent_id"],
+                    "operation": rec["operation"],
+                    "lock_time": rec["lock_time"] / 1e6,
+                    "expires_at": rec["expires_at"] / 1e6,
+                    "age_seconds": (now - rec["lock_time"]) / 1e6
+                }
+                for rec in self._mem_locks.values()
+            ]
+
 
 # Example usage
 if __name__ == "__main__":
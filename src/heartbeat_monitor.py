@@ -12,12 +12,38 @@ Research Context:
 NOT FOR PRODUCTION USE - EDUCATIONAL PURPOSES ONLY
 """
 
+import json
+import queue
 import sqlite3
+import sys
 import time
 from typing import List, Dict, Optional
 import threading
 
 
+def _now_us() -> int:
+    """Current time as integer microseconds since the epoch."""
+    return time.time_ns() // 1000
+
+
+# Capabilities are immutable once registered and agents share a small
+# vocabulary of capability strings, so the parsed tuples are cached by
+# their JSON encoding and the strings interned instead of re-allocating
+# an identical list for every result row.
+_CAPS_CACHE: Dict[str, tuple] = {}
+
+
+def _parse_caps(caps_json: Optional[str]) -> tuple:
+    """Parse a JSON capability array into a cached tuple of interned strings."""
+    if not caps_json:
+        return ()
+    caps = _CAPS_CACHE.get(caps_json)
+    if caps is None:
+        caps = tuple(sys.intern(cap) for cap in json.loads(caps_json))
+        _CAPS_CACHE[caps_json] = caps
+    return caps
+
+
 class HeartbeatMonitor:
     """
     Monitors agent liveness through periodic heartbeat signals.
@@ -43,26 +69,139 @@ class HeartbeatMonitor:
         """
         self.db_path = db_path
         self.timeout_seconds = timeout_seconds
-        self.lock = threading.Lock()
+        self._tls = threading.local()
         self._init_database()
 
+        # Heartbeats are queued and applied in batches by a single
+        # writer thread, amortizing one commit across many updates
+        self._hb_queue = queue.SimpleQueue()
+        self._hb_stop = object()  # shutdown sentinel for the writer
+        self._hb_writer = threading.Thread(
+            target=self._heartbeat_writer, daemon=True
+        )
+        self._hb_writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a database connection with performance pragmas applied.
+
+        WAL mode allows concurrent readers and writers; the busy timeout
+        lets SQLite retry internally instead of surfacing "database is
+        locked" errors during heartbeat bursts.
+        """
+        conn = sqlite3.connect(
+            self.db_path, isolation_level=None, check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        """
+        Return this thread's cached connection, opening it on first use.
+
+        Heartbeats arrive on a tight cadence, so paying a connection
+        open and WAL attach per call dominates the actual UPDATE; one
+        cached connection per thread removes that overhead.
+        """
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._tls.conn = conn
+        return conn
+
+    def _heartbeat_writer(self):
+        """
+        Writer loop: drain queued heartbeats and apply each batch in
+        one transaction.
+
+        threading.Event instances pushed onto the queue act as flush
+        barriers and are set once everything queued before them has
+        been committed.
+        """
+        conn = self._conn()
+
+        stopping = False
+        while not stopping:
+            batch = [self._hb_queue.get()]
+            while True:
+                try:
+                    batch.append(self._hb_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = []
+            barriers = []
+            for item in batch:
+                if item is self._hb_stop:
+                    stopping = True
+                elif isinstance(item, threading.Event):
+                    barriers.append(item)
+                else:
+                    agent_id, status, ts = item
+                    rows.append((ts, status, agent_id))
+
+            if rows:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany("""
+                    UPDATE active_agents
+                    SET last_heartbeat = ?, status = COALESCE(?, status)
+                    WHERE agent_id = ?
+                """, rows)
+                conn.execute("COMMIT")
+
+            for barrier in barriers:
+                barrier.set()
+
+    def flush(self):
+        """Block until every heartbeat queued so far has been written."""
+        barrier = threading.Event()
+        self._hb_queue.put(barrier)
+        barrier.wait()
+
+    def close(self):
+        """
+        Shut down the monitor.
+
+        Drains and stops the heartbeat writer, checkpoints and truncates
+        the WAL so the sidecar file does not outlive the process, and
+        closes the calling thread's cached connection.
+        """
+        self._hb_queue.put(self._hb_stop)
+        self._hb_writer.join()
+
+        conn = self._conn()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+        self._tls.conn = None
+
     def _init_database(self):
         """Create necessary database tables."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._connect()
 
         # Active agents table
-        cursor.execute("""
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS active_agents (
                 agent_id TEXT PRIMARY KEY,
                 capabilities TEXT,
                 status TEXT,
-                last_heartbeat REAL NOT NULL,
-                registered_at REAL NOT NULL,
+                last_heartbeat INTEGER NOT NULL,
+                registered_at INTEGER NOT NULL,
                 workload INTEGER DEFAULT 0
             )
         """)
 
+        # Liveness queries and stale-agent cleanup both filter on
+        # last_heartbeat; index it so they are range seeks, not scans
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_agents_heartbeat
+            ON active_agents(last_heartbeat)
+        """)
+
         conn.commit()
         conn.close()
 
@@ -83,23 +222,27 @@ class HeartbeatMonitor:
         Returns:
             True if registered successfully
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            now = time.time()
-            capabilities_str = ",".join(capabilities)
-
-            cursor.execute("""
-                INSERT OR REPLACE INTO active_agents
-                (agent_id, capabilities, status, last_heartbeat, registered_at, workload)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (agent_id, capabilities_str, status, now, now, 0))
-
-            conn.commit()
-            conn.close()
-
-            return True
+        conn = self._conn()
+
+        now = _now_us()
+        # JSON keeps the capability list queryable with the JSON1
+        # functions and parses with C-implemented json.loads on read
+        capabilities_json = json.dumps(capabilities)
+
+        # ON CONFLICT updates the row in place, unlike INSERT OR REPLACE
+        # which deletes and re-inserts (rewriting every index entry) and
+        # would clobber registered_at and workload on re-registration
+        conn.execute("""
+            INSERT INTO active_agents
+            (agent_id, capabilities, status, last_heartbeat, registered_at, workload)
+            VALUES (?, ?, ?, ?, ?, 0)
+            ON CONFLICT(agent_id) DO UPDATE SET
+                capabilities = excluded.capabilities,
+                status = excluded.status,
+                last_heartbeat = excluded.last_heartbeat
+        """, (agent_id, capabilities_json, status, now, now))
+
+        return True
 
     def send_heartbeat(
         self,
@@ -109,37 +252,19 @@ class HeartbeatMonitor:
         """
         Send heartbeat signal from agent.
 
-        This updates the last_heartbeat timestamp, indicating the agent is alive.
+        This updates the last_heartbeat timestamp, indicating the agent
+        is alive. The write is queued and applied asynchronously by the
+        writer thread; call flush() to wait for it to hit the database.
 
         Args:
             agent_id: Agent sending heartbeat
             status: Optional status update
 
         Returns:
-            True if heartbeat recorded, False if agent not registered
+            True once the heartbeat is queued
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            if status:
-                cursor.execute("""
-                    UPDATE active_agents
-                    SET last_heartbeat = ?, status = ?
-                    WHERE agent_id = ?
-                """, (time.time(), status, agent_id))
-            else:
-                cursor.execute("""
-                    UPDATE active_agents
-                    SET last_heartbeat = ?
-                    WHERE agent_id = ?
-                """, (time.time(), agent_id))
-
-            rows_updated = cursor.rowcount
-            conn.commit()
-            conn.close()
-
-            return rows_updated > 0
+        self._hb_queue.put((agent_id, status, _now_us()))
+        return True
 
     def get_active_agents(
         self,
@@ -154,40 +279,54 @@ class HeartbeatMonitor:
         Returns:
             List of active agent dictionaries
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cutoff_time = time.time() - self.timeout_seconds
-
-            cursor.execute("""
-                SELECT agent_id, capabilities, status, last_heartbeat, registered_at, workload
-                FROM active_agents
-                WHERE last_heartbeat > ?
-            """, (cutoff_time,))
-
-            agents = []
-            for row in cursor.fetchall():
-                agent_id, caps_str, status, last_hb, registered, workload = row
-                capabilities = caps_str.split(",") if caps_str else []
-
-                # Apply capability filter if specified
-                if capability_filter:
-                    if not all(cap in capabilities for cap in capability_filter):
-                        continue
-
-                agents.append({
-                    "agent_id": agent_id,
-                    "capabilities": capabilities,
-                    "status": status,
-                    "last_heartbeat": last_hb,
-                    "registered_at": registered,
-                    "workload": workload,
-                    "age_seconds": time.time() - last_hb
-                })
-
-            conn.close()
-            return agents
+        conn = self._conn()
+
+        now = _now_us()
+        cutoff_time = now - self.timeout_seconds * 1_000_000
+
+        # Compute the age once in SQL rather than per row in Python
+        sql = """
+            SELECT agent_id, capabilities, status, last_heartbeat,
+                   registered_at, workload,
+                   (? - last_heartbeat) AS age_us
+            FROM active_agents
+            WHERE last_heartbeat > ?
+        """
+        params = [now, cutoff_time]
+
+        # Filter in SQL with json_each so only matching rows cross the
+        # C-to-Python boundary: an agent qualifies when no required
+        # capability is missing from its capability array
+        if capability_filter:
+            sql += """
+                AND NOT EXISTS (
+                    SELECT 1 FROM json_each(?) AS required
+                    WHERE required.value NOT IN (
+                        SELECT value FROM json_each(active_agents.capabilities)
+                    )
+                )
+            """
+            params.append(json.dumps(capability_filter))
+
+        cursor = conn.execute(sql, params)
+
+        agents = []
+        for row in cursor.fetchall():
+            capabilities = _parse_caps(row["capabilities"])
+
+            # Stored as integer microseconds; convert to epoch seconds
+            # only at the output boundary
+            agents.append({
+                "agent_id": row["agent_id"],
+                "capabilities": capabilities,
+                "status": row["status"],
+                "last_heartbeat": row["last_heartbeat"] / 1e6,
+                "registered_at": row["registered_at"] / 1e6,
+                "workload": row["workload"],
+                "age_seconds": row["age_us"] / 1e6
+            })
+
+        return agents
 
     def cleanup_stale_agents(self) -> int:
         """
@@ -199,22 +338,17 @@ class HeartbeatMonitor:
         Returns:
             Number of agents removed
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cutoff_time = time.time() - self.timeout_seconds
+        conn = self._conn()
 
-            cursor.execute("""
-                DELETE FROM active_agents
-                WHERE last_heartbeat < ?
-            """, (cutoff_time,))
+        now = _now_us()
+        cutoff_time = now - self.timeout_seconds * 1_000_000
 
-            removed_count = cursor.rowcount
-            conn.commit()
-            conn.close()
+        cursor = conn.execute("""
+            DELETE FROM active_agents
+            WHERE last_heartbeat < ?
+        """, (cutoff_time,))
 
-            return removed_count
+        return cursor.rowcount
 
     def unregister_agent(self, agent_id: str) -> bool:
         """
@@ -226,20 +360,14 @@ class HeartbeatMonitor:
         Returns:
             True if agent was removed
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        conn = self._conn()
 
-            cursor.execute("""
-                DELETE FROM active_agents
-                WHERE agent_id = ?
-            """, (agent_id,))
-
-            rows_deleted = cursor.rowcount
-            conn.commit()
-            conn.close()
+        cursor = conn.execute("""
+            DELETE FROM active_agents
+            WHERE agent_id = ?
+        """, (agent_id,))
 
-            return rows_deleted > 0
+        return cursor.rowcount > 0
 
     def get_agent_status(self, agent_id: str) -> Optional[Dict]:
         """
@@ -251,31 +379,27 @@ class HeartbeatMonitor:
         Returns:
             Agent status dictionary or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._conn()
 
-        cursor.execute("""
+        row = conn.execute("""
             SELECT agent_id, capabilities, status, last_heartbeat, registered_at, workload
             FROM active_agents
             WHERE agent_id = ?
-        """, (agent_id,))
-
-        row = cursor.fetchone()
-        conn.close()
+        """, (agent_id,)).fetchone()
 
         if row:
             agent_id, caps_str, status, last_hb, registered, workload = row
-            capabilities = caps_str.split(",") if caps_str else []
+            capabilities = _parse_caps(caps_str)
 
-            time_since_heartbeat = time.time() - last_hb
+            time_since_heartbeat = (_now_us() - last_hb) / 1e6
             is_alive = time_since_heartbeat < self.timeout_seconds
 
             return {
                 "agent_id": agent_id,
                 "capabilities": capabilities,
                 "status": status,
-                "last_heartbeat": last_hb,
-                "registered_at": registered,
+                "last_heartbeat": last_hb / 1e6,
+                "registered_at": registered / 1e6,
                 "workload": workload,
                 "time_since_heartbeat": time_since_heartbeat,
                 "is_alive": is_alive
@@ -323,7 +447,8 @@ if __name__ == "__main__":
         else:
             print("  worker-02: No heartbeat (simulating failure)")
 
-        # Check active agents
+        # Check active agents (flush so queued heartbeats are visible)
+        monitor.flush()
         active = monitor.get_active_agents()
         print(f"  Active agents: {len(active)}")
         for agent in active: